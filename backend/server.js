@@ -3,6 +3,7 @@ const WebSocket = require('ws');
 const http = require('http');
 const { createClient } = require('@deepgram/sdk');
 const OpenAI = require('openai');
+const { HttpsAgent } = require('agentkeepalive');
 require('dotenv').config();
 
 const app = express();
@@ -11,6 +12,9 @@ const server = http.createServer(app);
 // Configure WebSocket server with CORS
 const wss = new WebSocket.Server({
     server,
+    // Payloads are small JSON messages; per-client deflate would only add
+    // CPU and memory per connection
+    perMessageDeflate: false,
     cors: {
         origin: "*",
         credentials: true
@@ -20,6 +24,12 @@ const wss = new WebSocket.Server({
 const PORT = process.env.PORT || 3001;
 const HOST = process.env.HOST || '0.0.0.0';
 
+// API keys are resolved once at startup; the README placeholders count as unset
+const DEEPGRAM_API_KEY = process.env.DEEPGRAM_API_KEY;
+const OPENAI_API_KEY = process.env.OPENAI_API_KEY;
+const HAS_DEEPGRAM_KEY = Boolean(DEEPGRAM_API_KEY && DEEPGRAM_API_KEY !== 'your_deepgram_api_key_here');
+const HAS_OPENAI_KEY = Boolean(OPENAI_API_KEY && OPENAI_API_KEY !== 'your_openai_api_key_here');
+
 // Add CORS headers for development
 app.use((req, res, next) => {
     res.header('Access-Control-Allow-Origin', '*');
@@ -36,40 +46,79 @@ app.get('/health', (req, res) => {
 app.use(express.static('build'));
 
 // Check for API keys
-if (!process.env.DEEPGRAM_API_KEY) {
+if (!HAS_DEEPGRAM_KEY) {
     console.error('ERROR: Please set your DEEPGRAM_API_KEY in the .env file');
     console.error('Get your API key from: https://console.deepgram.com/');
     process.exit(1);
 }
 
-if (!process.env.OPENAI_API_KEY) {
+if (!HAS_OPENAI_KEY) {
     console.error('ERROR: Please set your OPENAI_API_KEY in the .env file');
     console.error('Get your API key from: https://platform.openai.com/');
     process.exit(1);
 }
 
-const deepgram = createClient(process.env.DEEPGRAM_API_KEY);
-const openai = new OpenAI({ apiKey: process.env.OPENAI_API_KEY });
+const deepgram = createClient(DEEPGRAM_API_KEY);
+// Keep TLS connections to OpenAI alive between translations instead of
+// paying the TCP + TLS handshake for every chunk. Translations run one at a
+// time, so a single socket is normally in use; the pool size is only a cap.
+const OPENAI_MAX_SOCKETS = 4;
+const OPENAI_MAX_IDLE_SOCKETS = 2;
+// agentkeepalive (what the SDK uses by default) also expires idle sockets the
+// server may already have closed, so reuse doesn't fail with ECONNRESET
+const openaiAgent = new HttpsAgent({
+    keepAlive: true,
+    timeout: 5 * 60 * 1000, // same socket timeout as the SDK's default agent
+    maxSockets: OPENAI_MAX_SOCKETS,
+    maxFreeSockets: OPENAI_MAX_IDLE_SOCKETS,
+});
+const openai = new OpenAI({ apiKey: OPENAI_API_KEY, httpAgent: openaiAgent });
 
-// Translation cache to avoid repeated translations
+// Translation cache to avoid repeated translations (LRU via Map insertion order)
+const TRANSLATION_CACHE_LIMIT = 512;
 const translationCache = new Map();
 
 // Global Deepgram connection shared among all clients
 let globalDeepgramLive = null;
 let isTranscriptionActive = false;
 
-// Removed queue system for immediate display (performance optimized)
+// Last interim transcript sent to clients; repeats are not re-broadcast
+let lastInterimTranscript = '';
+
+// Interim results are coalesced: at most one broadcast per window, carrying
+// the newest transcript (intermediate states are usually obsolete already)
+const INTERIM_BROADCAST_DELAY_MS = 50;
+let pendingInterimTranscript = null;
+let interimBroadcastTimer = null;
 
 // Simple 5-second translation system
 const STRICT_CHUNK_TIME_MS = 2000; // 2-second chunks to reduce latency/backlog
-let currentChunk = ''; // Current chunk being accumulated
+let chunkParts = []; // Trimmed final transcripts in the current chunk, joined on flush
+let chunkLength = 0; // Length of the joined chunk text
 let chunkTimer = null; // Timer for chunk processing
 let chunkStartTime = null; // When current chunk started
 
+// Chunks waiting for translation; while one request is in flight, newer
+// chunks pile up here and go out together (up to MAX_BATCH_CHUNKS per request)
+const MAX_BATCH_CHUNKS = 3;
+let pendingChunks = [];
+let isTranslating = false;
+
+// Translations run one at a time, so a stalled request must fail fast instead
+// of holding every later subtitle (SDK default: 600 s timeout, 2 retries)
+const TRANSLATION_TIMEOUT_MS = 8000;
+const TRANSLATION_MAX_RETRIES = 1;
+
+// Text patterns
+const LETTER_RE = /[A-Za-z\u0104\u0105\u0106\u0107\u0118\u0119\u0141\u0142\u0143\u0144\u00D3\u00F3\u015A\u015B\u0179\u017A\u017B\u017C]/;
+const SENTENCE_TERMINALS = new Set(['.', '!', '?']);
+const CLAUSE_SPLIT_RE = /(?:,\s+(?:and|but|or|so|because|however|therefore|meanwhile))/i;
+const WHITESPACE_RE = /\s+/;
+
 // Simple translation function
 // A "meaningful" text is anything containing at least one letter (latin or polish)
 function isMeaningful(text) {
-    return /[A-Za-z\u0104\u0105\u0106\u0107\u0118\u0119\u0141\u0142\u0143\u0144\u00D3\u00F3\u015A\u015B\u0179\u017A\u017B\u017C]/.test(text);
+    return LETTER_RE.test(text);
 }
 
 async function translateAndDisplay(chunkText) {
@@ -88,13 +137,12 @@ async function translateAndDisplay(chunkText) {
             if (polishSentences.length > 0) {
                 // Display immediately
                 polishSentences.forEach(sentence => {
-                    broadcastToAll({
-                        type: 'polish_sentence',
-                        sentence: sentence,
-                        displayTime: 1000
-                    });
+                    broadcastToAll(encodePolishSentence(sentence));
                     console.log(`➤ PL: ${sentence}`);
                 });
+                // Clients clear their interim line when a translation arrives, so
+                // the next interim must be sent even if its text hasn't changed
+                lastInterimTranscript = '';
             }
         }
     } catch (error) {
@@ -102,24 +150,59 @@ async function translateAndDisplay(chunkText) {
     }
 }
 
+// Queue a chunk for translation, batching with any chunks already waiting
+function enqueueTranslation(chunkText) {
+    pendingChunks.push(chunkText);
+    if (!isTranslating) {
+        drainTranslationQueue();
+    }
+}
+
+// Take the next batch off the queue; the rest waits for the next iteration.
+// A cached chunk goes out alone so its cache hit isn't lost inside a batch.
+function takeTranslationBatch() {
+    if (translationCache.has(pendingChunks[0])) {
+        return pendingChunks.shift();
+    }
+
+    let count = 1;
+    while (count < pendingChunks.length && count < MAX_BATCH_CHUNKS
+        && !translationCache.has(pendingChunks[count])) {
+        count++;
+    }
+    if (count > 1) {
+        console.log(`📦 Batching ${count} chunks into one translation`);
+    }
+    return pendingChunks.splice(0, count).join(' ');
+}
+
+// Translate queued chunks one request at a time (keeps subtitles in order)
+async function drainTranslationQueue() {
+    isTranslating = true;
+    try {
+        while (pendingChunks.length > 0) {
+            await translateAndDisplay(takeTranslationBatch());
+        }
+    } finally {
+        isTranslating = false;
+    }
+}
+
 // Simple chunk accumulation with STRICT 5-second limit
 function addToChunk(text) {
     const trimmedText = text.trim();
     if (!trimmedText) return;
 
     // Start timing if this is first text
-    if (currentChunk.length === 0) {
+    if (chunkParts.length === 0) {
         chunkStartTime = Date.now();
     }
 
-    // Add to current chunk
-    if (currentChunk.length > 0) {
-        currentChunk += ' ' + trimmedText;
-    } else {
-        currentChunk = trimmedText;
-    }
+    // Add to current chunk (the text is only joined once, when the chunk is flushed)
+    chunkLength += (chunkParts.length > 0 ? 1 : 0) + trimmedText.length;
+    chunkParts.push(trimmedText);
 
-    console.log(`📝 Chunk: "${currentChunk}" (${currentChunk.length} chars)`);
+    console.log(`📝 Chunk: +"${trimmedText}" (${chunkLength} chars)`);
 
     // Check if we've hit 5 seconds - if so, cut immediately
     const elapsed = Date.now() - chunkStartTime;
@@ -140,13 +223,14 @@ function addToChunk(text) {
 
 // Process current chunk immediately
 function processCurrentChunk() {
-    if (currentChunk.trim().length > 0) {
+    if (chunkParts.length > 0) {
         console.log(`⏰ Processing chunk after ${Date.now() - chunkStartTime}ms`);
 
-        // Translate and display in background
-        translateAndDisplay(currentChunk.trim());
+        // Queue for translation (serialized, batched with any backlog)
+        enqueueTranslation(chunkParts.join(' '));
 
-        currentChunk = '';
+        chunkParts = [];
+        chunkLength = 0;
         chunkStartTime = null;
     }
 
@@ -160,9 +244,12 @@ function processCurrentChunk() {
 async function translateToPolish(text) {
     if (!text || text.trim().length === 0) return '';
 
-    // Check cache first
+    // Check cache first (refresh recency on hit)
     if (translationCache.has(text)) {
-        return translationCache.get(text);
+        const cached = translationCache.get(text);
+        translationCache.delete(text);
+        translationCache.set(text, cached);
+        return cached;
     }
 
     try {
@@ -182,13 +269,16 @@ async function translateToPolish(text) {
                 },
                 { role: 'user', content: text }
             ]
+        }, {
+            timeout: TRANSLATION_TIMEOUT_MS,
+            maxRetries: TRANSLATION_MAX_RETRIES,
         });
 
         const translation = (response.choices?.[0]?.message?.content || '').trim();
 
-        // Cache the translation
+        // Cache the translation, evicting the least recently used entry
         translationCache.set(text, translation);
-        if (translationCache.size > 100) {
+        if (translationCache.size > TRANSLATION_CACHE_LIMIT) {
             const firstKey = translationCache.keys().next().value;
             translationCache.delete(firstKey);
         }
@@ -201,6 +291,21 @@ async function translateToPolish(text) {
 
 // Removed calculateDisplayTime function - using immediate display for speed
 
+// Split text after each run of sentence terminals, keeping the punctuation.
+// Trailing text without a terminal is dropped. A single linear pass; the
+// equivalent regex match rescans an unterminated tail from every position.
+function splitOnTerminals(text) {
+    const sentences = [];
+    let start = 0;
+    for (let i = 0; i < text.length; i++) {
+        if (!SENTENCE_TERMINALS.has(text[i])) continue;
+        while (i + 1 < text.length && SENTENCE_TERMINALS.has(text[i + 1])) i++;
+        sentences.push(text.slice(start, i + 1));
+        start = i + 1;
+    }
+    return sentences;
+}
+
 // Function to split text into better sentences
 function splitIntoSentences(text) {
     if (!text) return [];
@@ -210,16 +315,16 @@ function splitIntoSentences(text) {
     if (text.length === 0) return [];
 
     // Split by sentence-ending punctuation, keeping the punctuation
-    let sentences = text.match(/[^.!?]*[.!?]+/g) || [];
+    let sentences = splitOnTerminals(text);
 
     // If no sentence-ending punctuation found, split by pauses and conjunctions
     if (sentences.length === 0) {
         // Try splitting by common pause indicators
-        sentences = text.split(/(?:,\s+(?:and|but|or|so|because|however|therefore|meanwhile))/i);
+        sentences = text.split(CLAUSE_SPLIT_RE);
 
         // If still one long piece, split by length (max ~15 words per chunk)
-        if (sentences.length === 1 && text.split(/\s+/).length > 15) {
-            const words = text.split(/\s+/);
+        const words = sentences.length === 1 ? text.split(WHITESPACE_RE) : null;
+        if (words && words.length > 15) {
             sentences = [];
             for (let i = 0; i < words.length; i += 15) {
                 sentences.push(words.slice(i, i + 15).join(' '));
@@ -237,12 +342,68 @@ function splitIntoSentences(text) {
 
 // Removed old display function - now using pipeline system
 
+// Messages without variable fields are encoded once at startup
+const READY_PAYLOAD = encodeMessage({ type: 'ready' });
+const STOPPED_PAYLOAD = encodeMessage({ type: 'stopped' });
+
+function encodeMessage(message) {
+    return Buffer.from(JSON.stringify(message));
+}
+
+// Specialized encoder for the fixed-shape polish_sentence message: only the
+// sentence needs escaping, the rest of the frame is constant. Produces the
+// same bytes as encodeMessage({ type, sentence, displayTime }).
+const POLISH_SENTENCE_PREFIX = '{"type":"polish_sentence","sentence":';
+const POLISH_SENTENCE_SUFFIX = ',"displayTime":1000}';
+
+function encodePolishSentence(sentence) {
+    return Buffer.from(POLISH_SENTENCE_PREFIX + JSON.stringify(sentence) + POLISH_SENTENCE_SUFFIX);
+}
+
+// Queue an interim transcript for the next coalesced broadcast
+function scheduleInterimBroadcast(transcript) {
+    pendingInterimTranscript = transcript;
+    if (interimBroadcastTimer) return;
+
+    interimBroadcastTimer = setTimeout(() => {
+        interimBroadcastTimer = null;
+        const latest = pendingInterimTranscript;
+        pendingInterimTranscript = null;
+        // Send only when it actually changed
+        if (latest !== null && latest !== lastInterimTranscript) {
+            lastInterimTranscript = latest;
+            broadcastToAll({
+                type: 'interim_transcript',
+                transcript: latest
+            }, true);
+        }
+    }, INTERIM_BROADCAST_DELAY_MS);
+}
+
+// Drop any queued interim transcript (superseded by a final result or stop)
+function resetInterimBroadcast() {
+    if (interimBroadcastTimer) {
+        clearTimeout(interimBroadcastTimer);
+        interimBroadcastTimer = null;
+    }
+    pendingInterimTranscript = null;
+    lastInterimTranscript = '';
+}
+
+// Clients with more than this much unsent data are considered slow
+const MAX_CLIENT_BUFFERED_BYTES = 64 * 1024;
+
 // Function to broadcast message to all connected clients
-function broadcastToAll(message) {
+// Droppable messages (e.g. interim transcripts, soon superseded anyway) are
+// skipped for slow clients so their send buffers don't grow without bound
+// Accepts a message object or an already encoded payload
+function broadcastToAll(message, droppable = false) {
+    // Serialize and UTF-8 encode once, then share the buffer with every client
+    const payload = Buffer.isBuffer(message) ? message : encodeMessage(message);
     wss.clients.forEach((client) => {
-        if (client.readyState === WebSocket.OPEN) {
-            client.send(JSON.stringify(message));
-        }
+        if (client.readyState !== WebSocket.OPEN) return;
+        if (droppable && client.bufferedAmount > MAX_CLIENT_BUFFERED_BYTES) return;
+        client.send(payload, { binary: false });
     });
 }
 
@@ -252,10 +413,23 @@ wss.on('connection', (ws, req) => {
 
     // Send current transcription status to new client
     if (isTranscriptionActive) {
-        ws.send(JSON.stringify({ type: 'ready' }));
+        ws.send(READY_PAYLOAD, { binary: false });
+        // Snapshot of the current interim line; later changes arrive as updates
+        if (lastInterimTranscript) {
+            ws.send(encodeMessage({ type: 'interim_transcript', transcript: lastInterimTranscript }), { binary: false });
+        }
     }
 
-    ws.on('message', async (message) => {
+    ws.on('message', (message, isBinary) => {
+        // Binary frames are raw linear16 PCM audio; forward to Deepgram as-is
+        // (only if transcription is active)
+        if (isBinary) {
+            if (globalDeepgramLive && isTranscriptionActive) {
+                globalDeepgramLive.send(message);
+            }
+            return;
+        }
+
         try {
             const data = JSON.parse(message);
 
@@ -279,13 +453,14 @@ wss.on('connection', (ws, req) => {
                     });
 
                     // Handle transcription results
-                    globalDeepgramLive.addListener('Results', async (data) => {
+                    globalDeepgramLive.addListener('Results', (data) => {
                         const transcript = data.channel.alternatives[0].transcript;
 
                         if (transcript && transcript.length > 0) {
                             if (data.is_final) {
                                 process.stdout.write(`\r${' '.repeat(80)}\r`);
                                 console.log(`➤ EN: ${transcript}`);
+                                resetInterimBroadcast();
 
                                 // Add to pipeline chunk system
                                 addToChunk(transcript);
@@ -299,11 +474,10 @@ wss.on('connection', (ws, req) => {
                                 // Show interim English results
                                 process.stdout.write(`\r... ${transcript}`);
 
-                                // Send interim transcript to clients (for English feedback)
-                                broadcastToAll({
-                                    type: 'interim_transcript',
-                                    transcript: transcript
-                                });
+                                // Send interim transcript to clients (for English feedback).
+                                // Interims are display-only and never translated; only
+                                // final results reach the chunk/translation pipeline.
+                                scheduleInterimBroadcast(transcript);
                             }
                         }
                     });
@@ -323,28 +497,23 @@ wss.on('connection', (ws, req) => {
                 }
 
                 // Notify the requesting client that transcription is ready
-                broadcastToAll({ type: 'ready' });
+                broadcastToAll(READY_PAYLOAD);
 
-            } else if (data.type === 'audio') {
-                // Forward audio data to Deepgram (only if transcription is active)
-                if (globalDeepgramLive && data.audio && isTranscriptionActive) {
-                    const audioBuffer = Buffer.from(data.audio, 'base64');
-                    globalDeepgramLive.send(audioBuffer);
-                }
             } else if (data.type === 'stop') {
                 console.log('Stopping transcription session...');
                 if (globalDeepgramLive) {
                     globalDeepgramLive.finish();
                     globalDeepgramLive = null;
                     isTranscriptionActive = false;
+                    resetInterimBroadcast();
 
                     // Notify all clients that transcription stopped
-                    broadcastToAll({ type: 'stopped' });
+                    broadcastToAll(STOPPED_PAYLOAD);
                 }
             }
         } catch (error) {
             console.error('Error processing message:', error);
-            ws.send(JSON.stringify({ type: 'error', message: error.message }));
+            ws.send(encodeMessage({ type: 'error', message: error.message }), { binary: false });
         }
     });
 
@@ -357,6 +526,7 @@ wss.on('connection', (ws, req) => {
             globalDeepgramLive.finish();
             globalDeepgramLive = null;
             isTranscriptionActive = false;
+            resetInterimBroadcast();
         }
     });
 
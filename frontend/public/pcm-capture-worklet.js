@@ -0,0 +1,36 @@
+// AudioWorklet processor for microphone capture.
+// Runs on the dedicated audio rendering thread, converts the 128-sample
+// render quanta straight to 16-bit PCM (linear16, what Deepgram expects) and
+// batches them into fixed-size chunks for the main thread.
+
+const CHUNK_SAMPLES = 4096; // same chunk size the ScriptProcessorNode used
+
+class PcmCaptureProcessor extends AudioWorkletProcessor {
+  constructor() {
+    super();
+    this.chunk = new Int16Array(CHUNK_SAMPLES);
+    this.offset = 0;
+  }
+
+  process(inputs) {
+    const input = inputs[0];
+    const channel = input && input[0];
+    if (!channel) return true; // no input connected yet
+
+    for (let i = 0; i < channel.length; i++) {
+      // Convert float32 to int16 (PCM format for Deepgram)
+      const sample = Math.max(-1, Math.min(1, channel[i]));
+      this.chunk[this.offset++] = sample < 0 ? sample * 0x8000 : sample * 0x7FFF;
+
+      if (this.offset === CHUNK_SAMPLES) {
+        // Transfer (not copy) the filled buffer; the main thread sends it as-is
+        this.port.postMessage(this.chunk.buffer, [this.chunk.buffer]);
+        this.chunk = new Int16Array(CHUNK_SAMPLES);
+        this.offset = 0;
+      }
+    }
+    return true;
+  }
+}
+
+registerProcessor('pcm-capture', PcmCaptureProcessor);
@@ -1,9 +1,12 @@
 import React, { useState, useRef, useCallback, useEffect } from 'react';
 import './App.css';
 
+// Only the most recent lines are kept; older ones scroll out of the transcript
+const MAX_TRANSCRIPT_LINES = 50;
+
 const App = () => {
   const [isRecording, setIsRecording] = useState(false);
-  const [transcript, setTranscript] = useState('');
+  const [transcriptLines, setTranscriptLines] = useState([]);
   const [interimTranscript, setInterimTranscript] = useState('');
   const [connectionStatus, setConnectionStatus] = useState('disconnected');
   const [error, setError] = useState('');
@@ -29,7 +32,6 @@ const App = () => {
 
     // Smart WebSocket URL construction
     let wsUrl;
-    const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
     const host = window.location.hostname;
 
     // Check if we're running in production (HTTPS) or development
@@ -70,7 +72,7 @@ const App = () => {
           // Display Polish translations on main page too
           const polishText = data.sentence?.trim() || '';
           if (polishText) {
-            setTranscript(prev => prev + '🇵🇱 ' + polishText + '\n');
+            setTranscriptLines(prev => [...prev.slice(-(MAX_TRANSCRIPT_LINES - 1)), '🇵🇱 ' + polishText]);
           }
           setInterimTranscript(''); // Clear interim when Polish appears
           break;
@@ -178,29 +180,23 @@ const App = () => {
       analyzerRef.current = audioContextRef.current.createAnalyser();
       analyzerRef.current.fftSize = 256;
 
-      // Create ScriptProcessorNode for raw audio data
-      processorRef.current = audioContextRef.current.createScriptProcessor(4096, 1, 1);
-
-      processorRef.current.onaudioprocess = (event) => {
-        const inputBuffer = event.inputBuffer;
-        const inputData = inputBuffer.getChannelData(0);
-
-        // Convert float32 to int16 (PCM format for Deepgram)
-        const int16Array = new Int16Array(inputData.length);
-        for (let i = 0; i < inputData.length; i++) {
-          const sample = Math.max(-1, Math.min(1, inputData[i]));
-          int16Array[i] = sample < 0 ? sample * 0x8000 : sample * 0x7FFF;
-        }
+      // Capture raw audio on the audio rendering thread (AudioWorklet) instead of
+      // the deprecated main-thread ScriptProcessorNode
+      await audioContextRef.current.audioWorklet.addModule(`${process.env.PUBLIC_URL}/pcm-capture-worklet.js`);
+      processorRef.current = new AudioWorkletNode(audioContextRef.current, 'pcm-capture', {
+        numberOfInputs: 1,
+        numberOfOutputs: 1,
+        // Mix any stereo input down to mono, as the ScriptProcessorNode did
+        channelCount: 1,
+        channelCountMode: 'explicit',
+        channelInterpretation: 'speakers',
+      });
 
-        // Send raw PCM data to server
+      processorRef.current.port.onmessage = (event) => {
+        // ArrayBuffer of 4096 int16 samples, already converted by the worklet
+        // Send raw PCM data to server as a binary frame (no base64/JSON wrapping)
         if (wsRef.current?.readyState === WebSocket.OPEN) {
-          const buffer = int16Array.buffer;
-          const base64 = btoa(String.fromCharCode(...new Uint8Array(buffer)));
-
-          wsRef.current.send(JSON.stringify({
-            type: 'audio',
-            audio: base64
-          }));
+          wsRef.current.send(event.data);
         }
       };
 
@@ -218,22 +214,25 @@ const App = () => {
       }
 
       setIsRecording(true);
-      setTranscript('');
+      setTranscriptLines([]);
       setInterimTranscript('');
 
     } catch (err) {
       console.error('Error starting recording:', err);
-      setError('Failed to access microphone. Please check permissions.');
+      // Once the stream is open, a failure is in audio setup (e.g. the capture
+      // worklet failed to load), not a permission problem
+      const micOpened = Boolean(streamRef.current);
+      releaseAudio();
+      setError(micOpened
+        ? 'Failed to start audio capture. Please use an up-to-date browser and reload the page.'
+        : 'Failed to access microphone. Please check permissions.');
     }
   };
 
-  // Stop recording
-  const stopRecording = () => {
-    if (animationFrameRef.current) {
-      cancelAnimationFrame(animationFrameRef.current);
-    }
-
+  // Release audio nodes, the AudioContext and the microphone stream
+  const releaseAudio = () => {
     if (processorRef.current) {
+      processorRef.current.port.onmessage = null;
       processorRef.current.disconnect();
       processorRef.current = null;
     }
@@ -250,8 +249,18 @@ const App = () => {
 
     if (streamRef.current) {
       streamRef.current.getTracks().forEach(track => track.stop());
+      streamRef.current = null;
+    }
+  };
+
+  // Stop recording
+  const stopRecording = () => {
+    if (animationFrameRef.current) {
+      cancelAnimationFrame(animationFrameRef.current);
     }
 
+    releaseAudio();
+
     if (wsRef.current?.readyState === WebSocket.OPEN) {
       wsRef.current.send(JSON.stringify({ type: 'stop' }));
     }
@@ -263,7 +272,7 @@ const App = () => {
 
   // Clear transcript
   const clearTranscript = () => {
-    setTranscript('');
+    setTranscriptLines([]);
     setInterimTranscript('');
   };
 
@@ -356,14 +365,14 @@ const App = () => {
 
           <div className="transcript-content">
             <div className="final-transcript">
-              {transcript}
+              {transcriptLines.join('\n')}
             </div>
             {interimTranscript && (
               <div className="interim-transcript">
                 ... {interimTranscript}
               </div>
             )}
-            {!transcript && !interimTranscript && !isRecording && (
+            {transcriptLines.length === 0 && !interimTranscript && !isRecording && (
               <div className="placeholder">
                 Click "Start Recording" and begin speaking to see transcription here.
                 <br />
@@ -12,13 +12,16 @@ const MAX_DISPLAY_MS = 6000; // cap duration
 const QUEUE_SOFT_LIMIT = 8;  // when pending exceeds this, speed up
 const QUEUE_HARD_LIMIT = 30; // drop oldest pending beyond this to avoid runaway lag
 
+const SENTENCE_RE = /[^.!?\n]*[.!?]+|[^.!?\n]+$/g;
+const WHITESPACE_RE = /\s+/g;
+
 function splitIntoSentences(text) {
   if (!text) return [];
   const trimmed = text.trim();
   if (!trimmed) return [];
-  const parts = trimmed.match(/[^.!?\n]*[.!?]+|[^.!?\n]+$/g) || [];
+  const parts = trimmed.match(SENTENCE_RE) || [];
   return parts
-    .map(s => s.replace(/\s+/g, ' ').trim())
+    .map(s => s.replace(WHITESPACE_RE, ' ').trim())
     .filter(s => s.length > 2);
 }
 
@@ -37,7 +40,7 @@ const SubtitlesOverlay = () => {
 
   // Add a new finalized sentence line
   const pushLine = useCallback((text) => {
-    const clean = (text || '').replace(/\s+/g, ' ').trim();
+    const clean = (text || '').replace(WHITESPACE_RE, ' ').trim();
     if (!clean) return;
 
     setLines(prev => {
@@ -94,7 +97,7 @@ const SubtitlesOverlay = () => {
   // Enqueue sentences and start ticking if idle
   const enqueueSentences = useCallback((sentences) => {
     const toAdd = sentences
-      .map(s => s.replace(/\s+/g, ' ').trim())
+      .map(s => s.replace(WHITESPACE_RE, ' ').trim())
       .filter(Boolean);
     if (toAdd.length === 0) return;
     // Cap queue to avoid unbounded lag; prefer keeping the newest